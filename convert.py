@@ -9,4 +9,6 @@ if __name__ == "__main__":
     except (NotationDataError, NotationImportError) as e:
         print(f'Error: {e.args[0]}')
     else:
-        print(put_mnx_score(s).decode('utf8'))
+        # Encode the whole document before writing anything, so that an
+        # error during encoding doesn't leave truncated JSON on stdout.
+        sys.stdout.buffer.write(put_mnx_score(s) + b'\n')
@@ -1,7 +1,31 @@
 from fractions import Fraction
-import json
+from functools import lru_cache
+from io import BytesIO
 from mnxconverter.score import *
 
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def dump_json_stdlib(obj, pretty=True) -> bytes:
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf8')
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf8')
+
+if orjson is None:
+    dump_json = dump_json_stdlib
+else:
+    def dump_json(obj, pretty=True) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            # orjson can't encode integers outside the 64-bit range,
+            # but the json module can.
+            return dump_json_stdlib(obj, pretty)
+
 NOTE_VALUE_BASES = {
     Fraction(16): 'duplexMaxima',
     Fraction(8): 'maxima',
@@ -47,13 +71,66 @@ ENDING_TYPES_FOR_EXPORT = {
     Ending.TYPE_STOP: 'stop',
     Ending.TYPE_DISCONTINUE: 'discontinue',
 }
+MARKING_TYPES_FOR_EXPORT = {
+    # TremoloMarking isn't here, because it has a value other than {}.
+    AccentMarking: 'accent',
+    BreathMarking: 'breath',
+    SoftAccentMarking: 'softAccent',
+    SpiccatoMarking: 'spiccato',
+    StaccatissimoMarking: 'staccatissimo',
+    StaccatoMarking: 'staccato',
+    StressMarking: 'stress',
+    StrongAccentMarking: 'strongAccent',
+    TenutoMarking: 'tenuto',
+    UnstressMarking: 'unstress',
+}
 SLUR_INCOMPLETE_LOCATIONS_FOR_EXPORT = {
     Slur.INCOMPLETE_TYPE_INCOMING: 'incoming',
     Slur.INCOMPLETE_TYPE_OUTGOING: 'outgoing',
 }
 
-def put_score(score) -> bytes:
-    writer = MNXWriter(score)
+# Constant values that are shared by every encoded object that
+# uses them. These must never be modified.
+EMPTY_OBJECT = {}
+ACCIDENTAL_DISPLAY_SHOW = {'show': True}
+
+# The following functions are cached, because scores tend to have
+# a small number of distinct values. They return the same dict for
+# the same input, so callers must not modify the result.
+
+@lru_cache(maxsize=None)
+def encode_note_value(frac:Fraction, dots:int):
+    result = {}
+    try:
+        result['base'] = NOTE_VALUE_BASES[frac]
+    except KeyError:
+        raise ValueError(f'Invalid duration fraction {frac}')
+    if dots:
+        result['dots'] = dots
+    return result
+
+@lru_cache(maxsize=None)
+def encode_pitch(step:str, octave:int, alter:int):
+    result = {}
+    if alter: # Don't bother encoding a zero, because that's the default.
+        result['alter'] = alter
+    result['octave'] = octave
+    result['step'] = step
+    return result
+
+@lru_cache(maxsize=None)
+def encode_clef(sign:str, staff_position:int):
+    return {
+        'sign': sign,
+        'staffPosition': staff_position
+    }
+
+def put_score(score, *, pretty=True) -> bytes:
+    """
+    Returns the MNX file data for the given Score. If pretty is False,
+    the JSON is written without indentation or extra whitespace.
+    """
+    writer = MNXWriter(score, pretty=pretty)
     return writer.get_filedata()
 
 class MNXWriter:
@@ -61,73 +138,156 @@ class MNXWriter:
     Helper class that tracks state during a single MNX writing.
     Not meant to be used to write multiple files.
     """
-    def __init__(self, score):
+    __slots__ = ('score', 'pretty', 'key_separator', 'timesig_changes', 'keysig_changes', 'sequence_item_encoders')
+
+    def __init__(self, score, pretty=True):
         self.score = score
+        self.pretty = pretty # If False, don't indent the JSON output.
+        self.key_separator = b': ' if pretty else b':'
+        self.timesig_changes = [] # Maps bar index to Bar.timesig_changed().
+        self.keysig_changes = [] # Maps bar index to Bar.keysig_changed().
+        self.find_signature_changes()
 
-    def get_filedata(self) -> bytes:
-        result = {
-            'mnx': {'version': 1}
+        # Maps SequenceItem classes to their encode_*() methods.
+        self.sequence_item_encoders = {
+            Event: self.encode_event,
+            Tuplet: self.encode_tuplet,
+            Ottava: self.encode_sequence_direction,
+            GraceNoteGroup: self.encode_grace_note_group,
         }
-        result['global'] = self.encode_global()
-        result['parts'] = self.encode_parts()
-        return json.dumps(result, indent=2, sort_keys=True).strip().encode('utf8')
 
-    def encode_global(self):
-        measures = []
+    def find_signature_changes(self):
+        """
+        Populates self.timesig_changes and self.keysig_changes in a
+        single pass over the bars, rather than calling the Bar methods
+        for each bar (which would walk backward through previous bars).
+        """
+        previous_timesig = None
+        previous_keysig = KeySignature(DEFAULT_KEYSIG)
         for bar in self.score.bars:
-            measures.append(self.encode_measure_global(bar))
-        return {
-            'measures': measures
-        }
+            keysig = previous_keysig if bar.keysig is None else bar.keysig
+            self.timesig_changes.append(bar.idx == 0 or previous_timesig != bar.timesig)
+            self.keysig_changes.append(previous_keysig != keysig)
+            previous_timesig = bar.timesig
+            previous_keysig = keysig
+
+    def get_filedata(self) -> bytes:
+        fp = BytesIO()
+        self.write(fp)
+        return fp.getvalue()
+
+    def write(self, fp):
+        """
+        Writes the MNX document to the given binary file-like object.
+
+        Rather than building the whole document in memory, this encodes
+        and writes a single measure at a time. Keys are written in
+        sorted order.
+        """
+        indent = self.newline(1)
+        fp.write(b'{' + indent + b'"global"' + self.key_separator)
+        self.write_global(fp, 1)
+        fp.write(b',' + indent + b'"mnx"' + self.key_separator)
+        self.write_json_value(fp, {'version': 1}, 1)
+        fp.write(b',' + indent + b'"parts"' + self.key_separator)
+        self.write_json_array(fp, self.score.parts, 1, self.write_part)
+        fp.write(self.newline(0) + b'}')
+
+    def newline(self, depth: int) -> bytes:
+        "Returns the whitespace that starts a line `depth` levels deep."
+        return b'\n' + b'  ' * depth if self.pretty else b''
+
+    def write_json_value(self, fp, obj, depth: int):
+        """
+        Writes obj to fp as JSON, as if it were nested `depth` levels
+        deep within an enclosing document.
+        """
+        data = dump_json(obj, self.pretty)
+        if depth and self.pretty:
+            data = data.replace(b'\n', self.newline(depth))
+        fp.write(data)
+
+    def write_json_array(self, fp, items, depth: int, write_item=None):
+        """
+        Writes the given iterable to fp as a JSON array, one item at a
+        time, so that each item can be discarded as soon as it's
+        written. write_item(fp, item, depth) writes a single item, and
+        defaults to self.write_json_value.
+        """
+        write_item = write_item or self.write_json_value
+        indent = self.newline(depth + 1)
+        fp.write(b'[')
+        is_empty = True
+        for item in items:
+            fp.write(indent if is_empty else b',' + indent)
+            write_item(fp, item, depth + 1)
+            is_empty = False
+        if not is_empty:
+            fp.write(self.newline(depth))
+        fp.write(b']')
+
+    def write_global(self, fp, depth: int):
+        indent = self.newline(depth)
+        fp.write(b'{' + self.newline(depth + 1) + b'"measures"' + self.key_separator)
+        self.write_json_array(fp, (self.encode_measure_global(bar) for bar in self.score.bars), depth + 1)
+        fp.write(indent + b'}')
+
+    def write_part(self, fp, part, depth: int):
+        indent = self.newline(depth + 1)
+        fp.write(b'{' + indent + b'"measures"' + self.key_separator)
+        part_id = part.part_id
+        bar_parts = [bar.bar_parts[part_id] for bar in self.score.bars]
+        encode_part_measure = self.encode_part_measure
+        self.write_json_array(fp, (encode_part_measure(bar_part) for bar_part in bar_parts), depth + 1)
+        if part.name is not None:
+            fp.write(b',' + indent + b'"name"' + self.key_separator)
+            self.write_json_value(fp, part.name, depth + 1)
+        fp.write(self.newline(depth) + b'}')
+
+    # Note: The encode_*() methods add keys in sorted order, because
+    # that's the order in which they're serialized.
 
     def encode_measure_global(self, bar):
         result = {}
-        if bar.timesig and bar.timesig_changed():
-            result['time'] = {
-                'count': bar.timesig[0],
-                'unit': bar.timesig[1]
-            }
-        if bar.keysig and bar.keysig_changed():
-            result['key'] = {'fifths': bar.keysig.fifths}
-        if bar.start_repeat:
-            result['repeatStart'] = {}
-        if bar.end_repeat:
-            repeat_end = {}
-            if bar.end_repeat > 2:
-                repeat_end['times'] = bar.end_repeat
-            result['repeatEnd'] = repeat_end
         if bar.start_ending:
             # TODO: 'duration'
             result['ending'] = {
                 'numbers': bar.start_ending.numbers
             }
-        return result
-
-    def encode_parts(self):
-        return list(self.encode_part(part) for part in self.score.parts)
-
-    def encode_part(self, part):
-        result = {}
-        if part.name is not None:
-            result['name'] = part.name
-        result['measures'] = list(self.encode_part_measure(bar.bar_parts[part.part_id]) for bar in self.score.bars)
+        if bar.keysig and self.keysig_changes[bar.idx]:
+            result['key'] = {'fifths': bar.keysig.fifths}
+        if bar.end_repeat:
+            if bar.end_repeat > 2:
+                result['repeatEnd'] = {'times': bar.end_repeat}
+            else:
+                result['repeatEnd'] = EMPTY_OBJECT
+        if bar.start_repeat:
+            result['repeatStart'] = EMPTY_OBJECT
+        if bar.timesig and self.timesig_changes[bar.idx]:
+            result['time'] = {
+                'count': bar.timesig[0],
+                'unit': bar.timesig[1]
+            }
         return result
 
     def encode_part_measure(self, bar_part:BarPart):
-        result = {
-            'sequences': list(self.encode_sequence(sequence) for sequence in bar_part.sequences)
-        }
+        result = {}
         if bar_part.clefs:
-            result['clefs'] = list(self.encode_positioned_clef(clef) for clef in bar_part.clefs)
+            result['clefs'] = [self.encode_positioned_clef(clef) for clef in bar_part.clefs]
+        result['sequences'] = [self.encode_sequence(sequence) for sequence in bar_part.sequences]
         # TODO: Implement beams.
         return result
 
     def encode_sequence(self, sequence:Sequence):
         return {
-            'content': list(self.encode_sequence_item(item) for item in sequence.items)
+            'content': [self.encode_sequence_item(item) for item in sequence.items]
         }
 
     def encode_sequence_item(self, item:SequenceItem):
+        encode = self.sequence_item_encoders.get(type(item))
+        if encode is not None:
+            return encode(item)
+        # Not one of the usual classes, so fall back to isinstance().
         if isinstance(item, Event):
             return self.encode_event(item)
         elif isinstance(item, Tuplet):
@@ -138,49 +298,37 @@ class MNXWriter:
             return self.encode_grace_note_group(item)
 
     def encode_event(self, event):
-        result = {'type': 'event'}
-        result['duration'] = self.encode_note_value(event.duration)
+        result = {'duration': self.encode_note_value(event.duration)}
         if event.is_referenced:
             result['id'] = event.event_id
+        if event.markings:
+            result['markings'] = self.encode_event_markings(event.markings)
         if event.is_rest():
-            result['rest'] = {}
+            result['rest'] = EMPTY_OBJECT
         else:
-            result['notes'] = list(self.encode_note(note) for note in event.event_items)
+            result['notes'] = [self.encode_note(note) for note in event.event_items]
         if event.slurs:
             encoded_slurs = (self.encode_slur(slur) for slur in event.slurs)
-            result['slurs'] = list(s for s in encoded_slurs if s is not None)
-        if event.markings:
-            result['markings'] = self.encode_event_markings(event.markings)
+            result['slurs'] = [s for s in encoded_slurs if s is not None]
+        result['type'] = 'event'
         return result
 
     def encode_note_value(self, duration:RhythmicDuration):
-        result = {}
-        try:
-            result['base'] = NOTE_VALUE_BASES[duration.frac]
-        except KeyError:
-            raise ValueError(f'Invalid duration fraction {duration.frac}')
-        if duration.dots:
-            result['dots'] = duration.dots
-        return result
+        return encode_note_value(duration.frac, duration.dots)
 
     def encode_note(self, note:Note):
-        result = {'pitch': self.encode_pitch(note.pitch)}
+        result = {}
+        if note.rendered_acc:
+            result['accidentalDisplay'] = ACCIDENTAL_DISPLAY_SHOW
         if note.is_referenced:
             result['id'] = note.note_id
-        if note.rendered_acc:
-            result['accidentalDisplay'] = {'show': True}
+        result['pitch'] = self.encode_pitch(note.pitch)
         if note.tie_end_note:
             result['tie'] = {'target': note.tie_end_note}
         return result
 
     def encode_pitch(self, pitch:Pitch):
-        result = {
-            'step': pitch.step,
-            'octave': pitch.octave,
-        }
-        if pitch.alter: # Don't bother encoding a zero, because that's the default.
-            result['alter'] = pitch.alter
-        return result
+        return encode_pitch(pitch.step, pitch.octave, pitch.alter)
 
     def encode_slur(self, slur:Slur):
         result = {}
@@ -192,49 +340,39 @@ class MNXWriter:
                 # Rather than generating invalid markup, we just
                 # return None.
                 return None
+            if slur.side is not None:
+                result['side'] = SLUR_SIDES_FOR_EXPORT[slur.side]
         else:
             if slur.end_event_id is None:
                 # Don't create the <slur>, because we don't have
                 # enough data.
                 return None
-            result['target'] = slur.end_event_id
-            if slur.start_note:
-                result['startNote'] = slur.start_note
             if slur.end_note:
                 result['endNote'] = slur.end_note
-        if slur.side is not None:
-            result['side'] = SLUR_SIDES_FOR_EXPORT[slur.side]
+            if slur.side is not None:
+                result['side'] = SLUR_SIDES_FOR_EXPORT[slur.side]
+            if slur.start_note:
+                result['startNote'] = slur.start_note
+            result['target'] = slur.end_event_id
         return result
 
     def encode_event_markings(self, markings:list):
         result = {}
         for marking in markings:
-            if isinstance(marking, AccentMarking):
-                result['accent'] = {}
-            elif isinstance(marking, BreathMarking):
-                result['breath'] = {}
-            elif isinstance(marking, SoftAccentMarking):
-                result['softAccent'] = {}
-            elif isinstance(marking, SpiccatoMarking):
-                result['spiccato'] = {}
-            elif isinstance(marking, StaccatissimoMarking):
-                result['staccatissimo'] = {}
-            elif isinstance(marking, StaccatoMarking):
-                result['staccato'] = {}
-            elif isinstance(marking, StressMarking):
-                result['stress'] = {}
-            elif isinstance(marking, StrongAccentMarking):
-                result['strongAccent'] = {}
-            elif isinstance(marking, TenutoMarking):
-                result['tenuto'] = {}
-            elif isinstance(marking, TremoloMarking):
+            marking_type = type(marking)
+            if marking_type is TremoloMarking:
                 result['tremolo'] = {'marks': marking.marks}
-            elif isinstance(marking, UnstressMarking):
-                result['unstress'] = {}
-        return result
+            else:
+                try:
+                    result[MARKING_TYPES_FOR_EXPORT[marking_type]] = EMPTY_OBJECT
+                except KeyError:
+                    pass
+        # Markings are added in document order, so sort them here.
+        return {key: result[key] for key in sorted(result)}
 
     def encode_tuplet(self, tuplet:Tuplet):
         result = {
+            'content': [self.encode_sequence_item(item) for item in tuplet.items],
             'inner': {
                 'duration': 'TODO',
                 'multiple': tuplet.ratio.inner_numerator
@@ -244,7 +382,6 @@ class MNXWriter:
                 'multiple': tuplet.ratio.outer_numerator
             },
         }
-        result['content'] = list(self.encode_sequence_item(item) for item in tuplet.items)
         return result
 
     def encode_sequence_direction(self, direction:SequenceDirection):
@@ -273,10 +410,7 @@ class MNXWriter:
         return result
 
     def encode_clef(self, clef:Clef):
-        return {
-            'staffPosition': clef.staff_position,
-            'sign': clef.sign
-        }
+        return encode_clef(clef.sign, clef.staff_position)
 
     def encode_rhythmic_position(self, position:Fraction):
         return {
@@ -1,11 +1,16 @@
 from fractions import Fraction
 from io import BytesIO
 from lxml import etree
-import re
+import itertools
 import zipfile
+import zlib
 from mnxconverter.score import *
 
 ZIP_CONTAINER_FILENAME = 'META-INF/container.xml'
+ROOTFILE_XPATH = etree.XPath('rootfiles/rootfile')
+# Errors that ZipFile.open() raises for members it can't read,
+# e.g. encrypted members or unsupported compression methods.
+ZIP_MEMBER_ERRORS = (RuntimeError, NotImplementedError, zipfile.BadZipFile)
 RHYTHM_TYPES = {
     'breve': (2, 1),
     'whole': (1, 1),
@@ -27,6 +32,9 @@ RHYTHM_TYPES = {
     '512th': (1, 512),
     '1024th': (1, 1024),
 }
+# Aliases share a single Fraction, so equal types are the same object.
+RHYTHM_FRACTIONS = {v: Fraction(*v) for v in RHYTHM_TYPES.values()}
+RHYTHM_TYPE_FRACTIONS = {k: RHYTHM_FRACTIONS[v] for k, v in RHYTHM_TYPES.items()}
 ACCIDENTAL_TYPES_FOR_IMPORT = {
     'sharp': Note.ACCIDENTAL_SHARP,
     'natural': Note.ACCIDENTAL_NATURAL,
@@ -37,6 +45,22 @@ ACCIDENTAL_TYPES_FOR_IMPORT = {
     'natural-sharp': Note.ACCIDENTAL_NATURAL_SHARP,
     'natural-flat': Note.ACCIDENTAL_NATURAL_FLAT,
 }
+ARTICULATION_MARKINGS_FOR_IMPORT = {
+    # Maps <articulations> child tags to tuples of Marking classes.
+    'accent': (AccentMarking,),
+    'breath-mark': (BreathMarking,),
+    # MNX doesn't have the concept of a detached legato.
+    # It's represented simply by a staccato + tenuto.
+    'detached-legato': (StaccatoMarking, TenutoMarking),
+    'soft-accent': (SoftAccentMarking,),
+    'spiccato': (SpiccatoMarking,),
+    'staccatissimo': (StaccatissimoMarking,),
+    'staccato': (StaccatoMarking,),
+    'stress': (StressMarking,),
+    'strong-accent': (StrongAccentMarking,),
+    'tenuto': (TenutoMarking,),
+    'unstress': (UnstressMarking,),
+}
 SLUR_SIDES_FOR_IMPORT = {
     'above': Slur.SIDE_UP,
     'below': Slur.SIDE_DOWN,
@@ -56,6 +80,7 @@ ENDING_TYPES_FOR_IMPORT = {
     'stop': Ending.TYPE_STOP,
     'discontinue': Ending.TYPE_DISCONTINUE,
 }
+SMALL_INTEGERS = {str(i): i for i in range(-12, 13)} # Avoids int() for common <alter> and <octave> values.
 DEFAULT_KEYSIG = 0
 DIVISION_DURATION_WHOLE_NOTE = 4 # MusicXML constant specifying how many <divisions> are in a whole note.
 
@@ -70,6 +95,17 @@ class NotationDataError(Exception):
     """
     pass
 
+def find_child(el, tag):
+    """
+    Returns the first child of el with the given tag, or None.
+
+    This is equivalent to el.find(tag) for a plain tag name, but
+    it skips lxml's path parsing.
+    """
+    for child in el.iterchildren(tag):
+        return child
+    return None
+
 def get_score(filedata: bytes):
     """
     Returns a Score object for the given raw file data,
@@ -78,114 +114,102 @@ def get_score(filedata: bytes):
     Raises NotationImportError or NotationDataError
     in case of problems.
     """
-    xml = get_musicxml_etree(filedata)
-    xml = clean_musicxml(xml)
+    context = etree.iterparse(
+        get_musicxml_file(filedata),
+        events=('end',),
+        tag=('part-list', 'measure'),
+        resolve_entities=False, # resolve_entities prevents XXE attacks.
+    )
+    elements = iter_parsed_elements(context)
+    first_el = next(elements, None)
+    if first_el is not None and first_el.getparent().tag == 'score-timewise':
+        # A <score-timewise> document is already in the order we read
+        # it, so we can read (and discard) one <measure> at a time,
+        # rather than holding the whole document in memory.
+        reader = MusicXMLReader(first_el.getparent())
+        return reader.read_stream(first_el, elements)
+    for el in elements:
+        pass # Parse the rest of the document.
+    xml = clean_musicxml(context.root)
     return read_musicxml(xml)
 
-def get_musicxml_etree(filedata: bytes):
+def iter_parsed_elements(context):
     """
-    Given file contents (either compressed MusicXML or raw MusicXML),
-    returns an etree Element instance, taking care of unzipping if
-    necessary.
-
-    The result is not guaranteed to be MusicXML, but it is guaranteed
-    to be valid (parseable) XML)
+    Yields the elements from the given etree.iterparse() context,
+    converting XML syntax errors (and errors decompressing the
+    underlying zip file) to NotationImportError.
     """
-    fp = BytesIO(filedata)
-    parser = etree.XMLParser(resolve_entities=False) # resolve_entities prevents XXE attacks.
-    if zipfile.is_zipfile(fp):
-        zip_obj = zipfile.ZipFile(fp, 'r')
-        try:
-            container_fp = zip_obj.open(ZIP_CONTAINER_FILENAME)
-        except KeyError:
-            raise NotationImportError(f"Zip file is missing {ZIP_CONTAINER_FILENAME}.")
-        try:
-            container_xml = etree.XML(container_fp.read(), parser)
-        except etree.XMLSyntaxError:
-            raise NotationImportError(f"XML syntax error when parsing {ZIP_CONTAINER_FILENAME}.")
-        try:
-            rootfile_el = container_xml.xpath('rootfiles/rootfile')[0]
-        except IndexError:
-            raise NotationImportError(f"Missing 'rootfile' element in {ZIP_CONTAINER_FILENAME}.")
-        try:
-            musicxml_filename = rootfile_el.attrib['full-path']
-        except KeyError:
-            raise NotationImportError("Missing 'full-path' attribute on 'rootfile' element.")
-
-        musicxml_string = None
-        try:
-            musicxml_string = zip_obj.open(musicxml_filename).read()
-        except Exception:
-            # If that failed, it could be that the inner filename used a
-            # non-ASCII character, in which case the given `xml_filename`
-            # might be different than the actual filename used within the
-            # archive. To deal with this, we look at the list of inner
-            # filenames and find the one that ends with .xml which is *not*
-            # ZIP_CONTAINER_FILENAME.
-            for name in zip_obj.namelist():
-                if name.lower().endswith('.xml') and name != ZIP_CONTAINER_FILENAME:
-                    try:
-                        musicxml_string = zip_obj.open(name).read()
-                    except Exception:
-                        pass
-        if musicxml_string is None:
-            raise NotationImportError("Missing or empty MusicXML file within zip archive.")
-    else:
-        musicxml_string = filedata
     try:
-        return etree.XML(musicxml_string, parser)
+        for event, el in context:
+            yield el
     except etree.XMLSyntaxError as e:
         raise NotationImportError(f"XML syntax error: {e.args[0]}")
+    except (zipfile.BadZipFile, zlib.error):
+        raise NotationImportError("Couldn't decompress the MusicXML file within zip archive.")
 
-def convert_to_timewise(xml):
+def get_musicxml_file(filedata: bytes):
     """
-    Given a <score-partwise> MusicXML document as an etree
-    Element, converts it to <score-timewise>. The object is changed
-    in place, and it's also returned.
+    Given file contents (either compressed MusicXML or raw MusicXML),
+    returns a binary file-like object containing the raw MusicXML,
+    taking care of unzipping if necessary.
 
-    Input has top-level <part> tags with <measure> tags within.
-    Output has top-level <measure> tags with <part> tags within.
+    Compressed MusicXML is decompressed as the file is read, so that
+    the parser can consume it without a separate decompression pass.
     """
-    first_part = xml.find('part')
-    if first_part is None:
-        raise NotationImportError("Couldn't convert partwise to timewise.")
-
-    xml.tag = 'score-timewise'
-
-    new_measures = []
-    for old_measure in first_part.iterfind('measure'):
-        new_measure = etree.SubElement(xml, 'measure')
-        new_measure.attrib.update(old_measure.attrib)
-        new_measures.append(new_measure)
-
-    for part in xml.iterfind('part'):
-        for i, measure in enumerate(part.iterfind('measure')):
-            try:
-                new_measure = new_measures[i]
-            except IndexError:
-                continue # This measure wasn't in the first part. Skip!
-            else:
-                measure_part = etree.SubElement(new_measure, 'part')
-
-            # The 'number' attribute is required by the spec,
-            # but we tolerate it being missing. If it's missing,
-            # we assume <measure> elements are in order, hence
-            # using the value "i+1" to make the count one-based
-            # instead of zero-based.
-            measure_part.attrib['number'] = new_measure.attrib.get('number', str(i+1))
+    fp = BytesIO(filedata)
+    if not zipfile.is_zipfile(fp):
+        fp.seek(0)
+        return fp
 
-            measure_part.attrib.update(part.attrib)
-            for sub_el in measure:
-                measure_part.append(sub_el)
-            part.remove(measure)
-        xml.remove(part)
+    zip_obj = zipfile.ZipFile(fp, 'r')
+    try:
+        container_string = zip_obj.read(ZIP_CONTAINER_FILENAME)
+    except KeyError:
+        raise NotationImportError(f"Zip file is missing {ZIP_CONTAINER_FILENAME}.")
+    except ZIP_MEMBER_ERRORS + (zlib.error,) as e:
+        raise NotationImportError(f"Couldn't read {ZIP_CONTAINER_FILENAME}: {e}")
+    parser = etree.XMLParser(resolve_entities=False) # resolve_entities prevents XXE attacks.
+    try:
+        container_xml = etree.XML(container_string, parser)
+    except etree.XMLSyntaxError:
+        raise NotationImportError(f"XML syntax error when parsing {ZIP_CONTAINER_FILENAME}.")
+    try:
+        rootfile_el = ROOTFILE_XPATH(container_xml)[0]
+    except IndexError:
+        raise NotationImportError(f"Missing 'rootfile' element in {ZIP_CONTAINER_FILENAME}.")
+    try:
+        musicxml_filename = rootfile_el.attrib['full-path']
+    except KeyError:
+        raise NotationImportError("Missing 'full-path' attribute on 'rootfile' element.")
 
-    return xml
+    musicxml_fp = None
+    names = zip_obj.namelist()
+    if musicxml_filename in names:
+        try:
+            musicxml_fp = zip_obj.open(musicxml_filename)
+        except ZIP_MEMBER_ERRORS as e:
+            raise NotationImportError(f"Couldn't open {musicxml_filename} within zip archive: {e}")
+    else:
+        # The inner filename might have used a non-ASCII character,
+        # in which case the given `xml_filename` might be different
+        # than the actual filename used within the archive. To deal
+        # with this, we look at the list of inner filenames and find
+        # the one that ends with .xml which is *not*
+        # ZIP_CONTAINER_FILENAME.
+        for name in names:
+            if name.lower().endswith('.xml') and name != ZIP_CONTAINER_FILENAME:
+                try:
+                    musicxml_fp = zip_obj.open(name)
+                except ZIP_MEMBER_ERRORS:
+                    pass
+    if musicxml_fp is None:
+        raise NotationImportError("Missing or empty MusicXML file within zip archive.")
+    return musicxml_fp
 
 def clean_musicxml(xml):
-    if xml.tag == 'score-partwise':
-        xml = convert_to_timewise(xml)
-    elif xml.tag != 'score-timewise':
+    # <score-partwise> documents don't need converting to timewise,
+    # because MusicXMLReader can read either layout.
+    if xml.tag != 'score-partwise' and xml.tag != 'score-timewise':
         raise NotationImportError("Didn't find 'score-partwise' or 'score-timewise'.")
     return xml
 
@@ -202,66 +226,88 @@ class MusicXMLReader:
         self.xml = xml
         self.score = Score()
         self.part_divisions = {} # Maps part ID to current <divisions> value.
-        self.open_ties = []
+        self.division_fractions = {} # Maps (duration, divisions) to the Fraction of a whole note.
+        self.open_ties = {} # Maps (step, octave, alter) to a list of Notes with open ties, in order.
         self.current_beams = [] # List of (Sequence, Event, beam_data)
         self.open_beams = {} # Maps part ID to {beam_number: Beam} dictionaries.
         self.open_tuplets = {} # Maps MusicXML tuplet number to event_list.
         self.current_tuplets = [] # List of [sequence, event_list, ratio] lists.
-        self.open_slurs = {} # Maps MusicXML slur number to [Slur, slur_start_attrs, slur_end_attrs, first_note, last_note].
+        self.open_slurs = {} # Maps MusicXML slur number to [Slur, start_default_x, first_note, last_note].
         self.complete_slurs = [] # List of lists in the same format as self.open_slurs.
+        self.slur_event_pairs = {} # Maps (start Event, end Event) to the number of complete_slurs spanning them.
         self.current_grace_note_group = None # GraceNoteGroup object.
-        self.next_event_id = 1
-        self.next_note_id = 1
+        self.sequence_durations = {} # Maps Sequence to the durations of its Events so far, within the current bar.
+        self.next_event_number = 1
+        self.next_note_number = 1
         self.current_octave_shift = None # [shift_type, note_list].
         self.complete_octave_shifts = []
+        self.untransposed_parts = {} # Maps part ID to Parts whose transposition hasn't been parsed yet.
 
     def read(self):
-        self.parse_part_list()
-        self.parse_measures()
+        part_list_el = self.xml.find('part-list')
+        if part_list_el is not None:
+            self.parse_part_list(part_list_el)
+        if self.xml.tag == 'score-partwise':
+            self.parse_partwise_measures()
+        else:
+            self.parse_measures()
         return self.score
 
-    def parse_part_list(self):
+    def read_stream(self, first_el, elements):
+        """
+        Reads a <score-timewise> document from an iterator of
+        <part-list> and <measure> elements (including first_el, the
+        first one), as they're parsed by etree.iterparse().
+
+        Each <measure> is removed from the document as soon as it's
+        been read, so that only one is in memory at a time.
+        """
+        for el in itertools.chain((first_el,), elements):
+            if el.tag == 'part-list':
+                self.parse_part_list(el)
+            else:
+                self.parse_measure(el)
+                el.clear()
+                parent = el.getparent()
+                while el.getprevious() is not None:
+                    del parent[0]
+        return self.score
+
+    def parse_part_list(self, part_list_el):
         parts = self.score.parts
-        part_list_el = self.xml.find('part-list')
-        if part_list_el is not None:
-            for score_part_el in part_list_el.iterfind('score-part'):
-                part = self.parse_part(score_part_el)
-                parts.append(part)
+        for score_part_el in part_list_el.iterfind('score-part'):
+            part = self.parse_part(score_part_el)
+            parts.append(part)
+            self.untransposed_parts[part.part_id] = part
 
     def parse_part(self, score_part_el):
         try:
             part_id = score_part_el.attrib['id']
         except KeyError:
             raise NotationDataError(f"<score-part> on line {score_part_el.sourceline} is missing an 'id' attribute.")
-        part_name_el = score_part_el.find('part-name')
+        part_name_el = find_child(score_part_el, 'part-name')
         name = part_name_el.text if part_name_el is not None else None
-        try:
-            first_measure_el = self.xml.xpath('measure/part[@id=$partid]', partid=part_id)[0]
-        except IndexError:
-            transpose = 0
-        else:
-            transpose = self.parse_measure_transpose(first_measure_el)
         return Part(
             part_id=part_id,
             name=name,
-            transpose=transpose
         )
 
     def parse_measure_transpose(self, measure_el):
         """
-        Given the first <measure> element for a part, determines the
+        Given the first <measure> element for a part (that is, the
+        <part> within the first timewise <measure>), determines the
         part's transposition and returns it, as a chromatic value.
         """
         result = 0
         transpose_el = measure_el.find('attributes/transpose')
         if transpose_el is not None:
-            chromatic_el = transpose_el.find('chromatic')
+            chromatic_el = find_child(transpose_el, 'chromatic')
             if chromatic_el is not None and chromatic_el.text:
                 try:
                     result += int(chromatic_el.text)
                 except ValueError:
                     pass
-            octave_change_el = transpose_el.find('octave-change')
+            octave_change_el = find_child(transpose_el, 'octave-change')
             if octave_change_el is not None and octave_change_el.text:
                 try:
                     result += int(octave_change_el.text) * 12
@@ -270,14 +316,61 @@ class MusicXMLReader:
         return result
 
     def parse_measures(self):
+        # Like read_stream(), we empty each <measure> once it's been
+        # read, so the document shrinks as the Score grows.
+        for measure_el in self.xml.iterchildren('measure'):
+            self.parse_measure(measure_el)
+            measure_el.clear()
+
+    def parse_partwise_measures(self):
+        """
+        Reads the measures of a <score-partwise> document in timewise
+        order (the first <measure> of each <part>, then the second,
+        etc.), without rewriting the document.
+        """
+        part_measures = []
+        for part_el in self.xml.iterchildren('part'):
+            measure_els = list(part_el.iterchildren('measure'))
+            if measure_els:
+                # A part's transposition is defined in its first measure.
+                part = self.untransposed_parts.pop(part_el.get('id'), None)
+                if part is not None:
+                    part.transpose = self.parse_measure_transpose(measure_els[0])
+            part_measures.append(measure_els)
+        if not part_measures:
+            raise NotationImportError("Couldn't find any <part> in the partwise document.")
+
+        # The first part determines how many measures there are,
+        # and parts with fewer measures are skipped once they run out.
+        for bar_idx in range(len(part_measures[0])):
+            measure_els = [m[bar_idx] for m in part_measures if bar_idx < len(m)]
+            self.parse_bar(measure_els)
+            for measure_el in measure_els:
+                measure_el.clear()
+
+    def parse_measure(self, measure_el):
+        if self.untransposed_parts:
+            # A part's transposition is defined in its first measure.
+            for measure_part_el in measure_el.iterchildren('part'):
+                part = self.untransposed_parts.pop(measure_part_el.get('id'), None)
+                if part is not None:
+                    part.transpose = self.parse_measure_transpose(measure_part_el)
+        self.parse_bar(measure_el.iterchildren('part'))
+
+    def parse_bar(self, measure_part_els):
+        """
+        Adds a Bar to the Score, given the contents of the bar for
+        each part, in order -- either the <part>s of a timewise <measure>
+        or the corresponding <measure> of each part in a partwise
+        document.
+        """
         score = self.score
         bars = score.bars
         parts = score.parts
-        for idx, measure_el in enumerate(self.xml.iterfind('measure')):
-            bar = Bar(score, idx)
-            bars.append(bar)
-            for part_idx, measure_part_el in enumerate(measure_el.iterfind('part')):
-                self.parse_measure_part(measure_part_el, bar, parts[part_idx])
+        bar = Bar(score, len(bars))
+        bars.append(bar)
+        for part_idx, measure_part_el in enumerate(measure_part_els):
+            self.parse_measure_part(measure_part_el, bar, parts[part_idx])
 
     def parse_measure_part(self, measure_part_el, bar, part):
         position = 0
@@ -303,9 +396,15 @@ class MusicXMLReader:
         # corresponding Event for the start and end Notes, then
         # set the slur data on the two Events.
         if self.complete_slurs:
+            note_events = self.score.note_events
+            slur_event_pairs = self.slur_event_pairs
+            for obj in self.complete_slurs:
+                key = (note_events.get(obj[2]), note_events.get(obj[3]))
+                slur_event_pairs[key] = slur_event_pairs.get(key, 0) + 1
             for obj in self.complete_slurs:
                 self.add_slur(*obj)
             self.complete_slurs.clear()
+            slur_event_pairs.clear()
 
         # Handle the tuplets.
         for sequence, event_list, ratio in self.current_tuplets:
@@ -320,6 +419,8 @@ class MusicXMLReader:
             self.add_octave_shift(shift_type, note_list)
         self.complete_octave_shifts.clear()
 
+        self.sequence_durations.clear()
+
     def parse_measure_attributes(self, attributes_el, bar, part, bar_part, position):
         for el in attributes_el:
             tag = el.tag
@@ -353,10 +454,7 @@ class MusicXMLReader:
         # TODO: This assumes a five-line staff at the moment.
         staff_position = (2 * line) - 6
 
-        rhythmic_position = Fraction(
-            musicxml_position,
-            self.part_divisions[part.part_id] * DIVISION_DURATION_WHOLE_NOTE
-        )
+        rhythmic_position = self.get_division_fraction(musicxml_position, part)
         return PositionedClef(
             clef=Clef(
                 sign=sign,
@@ -365,11 +463,27 @@ class MusicXMLReader:
             position=rhythmic_position
         )
 
+    def get_division_fraction(self, duration, part):
+        """
+        Returns the given MusicXML duration (in the part's current
+        <divisions>) as a Fraction of a whole note.
+
+        The same few durations come up again and again, so we cache
+        the Fractions rather than calculating a gcd for every note.
+        """
+        key = (duration, self.part_divisions[part.part_id])
+        try:
+            return self.division_fractions[key]
+        except KeyError:
+            result = self.division_fractions[key] = Fraction(duration, key[1] * DIVISION_DURATION_WHOLE_NOTE)
+            return result
+
     def parse_divisions(self, divisions_el):
+        text = divisions_el.text
         try:
-            return int(divisions_el.text)
-        except ValueError:
-            raise NotationDataError(f'<divisions> on line {divisions_el.sourceline} has invalid value "{divisions_el.text}".')
+            return int(text)
+        except (TypeError, ValueError): # TypeError means the element is empty.
+            raise NotationDataError(f'<divisions> on line {divisions_el.sourceline} has invalid value "{text}".')
 
     def parse_barline(self, barline_el, bar):
         for el in barline_el:
@@ -391,10 +505,12 @@ class MusicXMLReader:
                     bar.end_repeat = times
 
     def parse_ending(self, el, bar):
-        ending_type = el.attrib.get('type', None)
+        ending_type = el.get('type')
         if ending_type == 'start':
-            if 'number' in el.attrib:
-                numbers = [int(n) for n in re.split(r'[\s,]+', el.attrib['number']) if n.strip().isdigit()]
+            number = el.get('number')
+            if number is not None:
+                # The numbers can be separated by commas and/or whitespace.
+                numbers = [int(n) for n in number.replace(',', ' ').split() if n.isdigit()]
                 if numbers:
                     bar.start_ending = Ending(
                         ENDING_TYPES_FOR_IMPORT[ending_type],
@@ -405,7 +521,7 @@ class MusicXMLReader:
 
     def parse_forward_backup(self, el):
         self.current_grace_note_group = None
-        duration_el = el.find('duration')
+        duration_el = find_child(el, 'duration')
         if duration_el is None:
             return 0
         return self.parse_duration(duration_el)
@@ -423,9 +539,9 @@ class MusicXMLReader:
                 self.parse_octave_shift(el)
 
     def parse_octave_shift(self, el):
-        type_ = el.attrib.get('type')
+        type_ = el.get('type')
         if type_ in {'up', 'down'}:
-            size = el.attrib.get('size', '8')
+            size = el.get('size', '8')
             if self.current_octave_shift is not None:
                 # TODO: Close the current octave shift? Raise error?
                 pass
@@ -448,13 +564,13 @@ class MusicXMLReader:
     def parse_duration(self, el):
         try:
             return int(el.text)
-        except ValueError:
+        except (TypeError, ValueError): # TypeError means the element is empty.
             return 0 # TODO: Raise an error here?
 
     def parse_key(self, key_el, part: Part):
         "Parses <key>. Returns a KeySignature object in concert pitch."
         try:
-            fifths = int(key_el.find('fifths').text)
+            fifths = int(find_child(key_el, 'fifths').text)
         except (AttributeError, ValueError):
             fifths = DEFAULT_KEYSIG
         return KeySignature(fifths).to_concert(part)
@@ -463,15 +579,15 @@ class MusicXMLReader:
         "Parses <time>. Returns timesig as a list."
         is_valid = True
         try:
-            numerator = int(time_el.find('beats').text)
+            numerator = int(find_child(time_el, 'beats').text)
         except (AttributeError, ValueError, TypeError):
             is_valid = False
         try:
-            denominator = int(time_el.find('beat-type').text)
+            denominator = int(find_child(time_el, 'beat-type').text)
         except (AttributeError, ValueError, TypeError):
             is_valid = False
         if not is_valid:
-            if time_el.attrib.get('symbol') == 'common':
+            if time_el.get('symbol') == 'common':
                 numerator, denominator = 4, 4
             else:
                 raise NotationDataError(f'<time> element on line {time_el.sourceline} contains invalid data.')
@@ -489,12 +605,13 @@ class MusicXMLReader:
         closed_tuplet_numbers = []
         event_markings = []
         time_mod = None
-        note = Note(self.score, f'note{self.next_note_id}')
+        note = None # Only created once we see <pitch>, so rests don't need one.
+        rendered_acc = None
         for el in note_el:
             tag = el.tag
             if tag == 'accidental':
                 try:
-                    note.rendered_acc = ACCIDENTAL_TYPES_FOR_IMPORT[el.text]
+                    rendered_acc = ACCIDENTAL_TYPES_FOR_IMPORT[el.text]
                 except KeyError:
                     raise NotationDataError(f'Got unsupported value "{el.text}" for <{tag}> on line {el.sourceline}.')
             elif tag == 'beam':
@@ -512,6 +629,7 @@ class MusicXMLReader:
                 if new_closed_tuplet_numbers:
                     closed_tuplet_numbers.extend(new_closed_tuplet_numbers)
             elif tag == 'pitch':
+                note = Note(self.score, self.next_note_number)
                 note.pitch = self.parse_pitch(el)
             elif tag == 'rest':
                 is_rest = True
@@ -526,10 +644,7 @@ class MusicXMLReader:
         # to calculate the fractional value. This is likely a rest.
         if note_type is None:
             try:
-                note_type = Fraction(
-                    duration,
-                    self.part_divisions[part.part_id] * DIVISION_DURATION_WHOLE_NOTE
-                )
+                note_type = self.get_division_fraction(duration, part)
                 num_dots = 0
             except Exception:
                 raise NotationDataError(f'<note> on line {note_el.sourceline} is missing a valid <type> or <duration>.')
@@ -545,42 +660,52 @@ class MusicXMLReader:
                 # TODO: Got a <note> with <chord> without a previous
                 # <note> in the voice. Show an error? For now, we
                 # effectively ignore the <chord> in this situation.
-                event = Event(sequence, f'ev{self.next_event_id}', rhythmic_duration)
-                self.next_event_id += 1
+                event = Event(sequence, self.next_event_number, rhythmic_duration)
+                self.next_event_number += 1
                 sequence.items.append(event)
+                self.set_event_location(sequence, event, rhythmic_duration.frac)
         else:
-            event = Event(sequence, f'ev{self.next_event_id}', rhythmic_duration)
-            self.next_event_id += 1
+            event = Event(sequence, self.next_event_number, rhythmic_duration)
+            self.next_event_number += 1
             if is_grace:
                 if not self.current_grace_note_group:
                     self.current_grace_note_group = GraceNoteGroup(sequence)
                     sequence.items.append(self.current_grace_note_group)
                 self.current_grace_note_group.events.append(event)
+                self.set_event_location(sequence, event, 0)
             else:
                 self.current_grace_note_group = None
                 sequence.items.append(event)
+                self.set_event_location(sequence, event, rhythmic_duration.frac)
 
         if is_rest:
             event_item = Rest()
         else:
-            if not note.pitch:
+            if not note:
                 raise NotationDataError(f'The <note> on line {note_el.sourceline} is missing <pitch>.')
+            note.rendered_acc = rendered_acc
             event_item = note
-            self.next_note_id += 1
+            self.next_note_number += 1
 
         event.event_items.append(event_item)
-        if self.open_tuplets:
-            for event_list in self.open_tuplets.values():
+        self.score.note_events[event_item] = event
+        open_tuplets = self.open_tuplets
+        if open_tuplets:
+            for event_list in open_tuplets.values():
                 event_list.append(event)
             for number in closed_tuplet_numbers:
-                complete_tuplet = self.open_tuplets.pop(number)
+                complete_tuplet = open_tuplets.pop(number)
                 self.current_tuplets.append([sequence, complete_tuplet, time_mod])
         if beams:
             self.current_beams.append((sequence, event, beams))
-        if self.current_octave_shift:
-            self.current_octave_shift[1].append(event_item)
+        current_octave_shift = self.current_octave_shift
+        if current_octave_shift:
+            current_octave_shift[1].append(event_item)
         if event_markings:
-            event.markings.extend(event_markings)
+            if event.markings:
+                event.markings.extend(event_markings)
+            else:
+                event.markings = event_markings
 
         # Return the duration of this event, to increment our internal position.
         # We don't do this if is_chord==True, because we assume the first <note>
@@ -590,9 +715,23 @@ class MusicXMLReader:
         else:
             return 0
 
+    def set_event_location(self, sequence, event, duration):
+        """
+        Records the given Event's measure location in the Score,
+        then adds its duration to the Sequence's list of durations.
+
+        The metrical position itself is only summed up if it's needed,
+        because Fraction arithmetic is slow and few events need it.
+        """
+        durations = self.sequence_durations.get(sequence)
+        if durations is None:
+            durations = self.sequence_durations[sequence] = []
+        self.score.event_locations[event] = (len(self.score.bars), durations, len(durations))
+        durations.append(duration)
+
     def parse_beam(self, beam_el):
         try:
-            number = int(beam_el.attrib.get('number', 1))
+            number = int(beam_el.get('number', 1))
         except ValueError:
             raise NotationDataError(f'<beam> on line {beam_el.sourceline} has an invalid "number" attribute.')
         return (number, beam_el.text)
@@ -609,12 +748,16 @@ class MusicXMLReader:
             elif tag == 'slur':
                 self.parse_slur(el, note)
             elif tag == 'tied':
-                tied_type = el.attrib.get('type')
+                tied_type = el.get('type')
                 if tied_type == 'start':
-                    self.open_ties.append(note)
+                    # A tie without a pitch (e.g., on a rest) can't be
+                    # matched with an end note, so we ignore it.
+                    if note:
+                        pitch = note.pitch
+                        self.open_ties.setdefault((pitch.step, pitch.octave, pitch.alter), []).append(note)
                 elif tied_type == 'stop':
                     # Find the Note that started this tie.
-                    if not note.pitch:
+                    if not note:
                         raise NotationDataError(f'<tied> on line {el.sourceline} must come after <pitch> within <note>.')
                     start_note = self.get_open_tie_by_end_note(note)
                     if start_note:
@@ -628,38 +771,18 @@ class MusicXMLReader:
 
     def parse_articulations(self, articulations_el, event_markings):
         for el in articulations_el:
-            tag = el.tag
-            if tag == 'accent':
-                event_markings.append(AccentMarking())
-            elif tag == 'breath-mark':
-                event_markings.append(BreathMarking())
-            elif tag == 'detached-legato':
-                # MNX doesn't have the concept of a detached legato.
-                # It's represented simply by a staccato + tenuto.
-                event_markings.append(StaccatoMarking())
-                event_markings.append(TenutoMarking())
-            elif tag == 'soft-accent':
-                event_markings.append(SoftAccentMarking())
-            elif tag == 'spiccato':
-                event_markings.append(SpiccatoMarking())
-            elif tag == 'staccatissimo':
-                event_markings.append(StaccatissimoMarking())
-            elif tag == 'staccato':
-                event_markings.append(StaccatoMarking())
-            elif tag == 'stress':
-                event_markings.append(StressMarking())
-            elif tag == 'strong-accent':
-                event_markings.append(StrongAccentMarking())
-            elif tag == 'tenuto':
-                event_markings.append(TenutoMarking())
-            elif tag == 'unstress':
-                event_markings.append(UnstressMarking())
+            try:
+                marking_classes = ARTICULATION_MARKINGS_FOR_IMPORT[el.tag]
+            except KeyError:
+                continue
+            for marking_class in marking_classes:
+                event_markings.append(marking_class())
 
     def parse_ornaments(self, ornaments_el, event_markings):
         for el in ornaments_el:
             tag = el.tag
             if tag == 'tremolo':
-                if el.attrib.get('type', 'single') == 'single':
+                if el.get('type', 'single') == 'single':
                     try:
                         marks = int(el.text)
                     except ValueError:
@@ -667,22 +790,21 @@ class MusicXMLReader:
                     event_markings.append(TremoloMarking(marks))
 
     def parse_slur(self, slur_el, note):
-        slur_type = slur_el.attrib.get('type')
+        slur_type = slur_el.get('type')
         try:
             slur_number = int(slur_el.get('number', 1))
         except (TypeError, ValueError):
             slur_number = 1
         if slur_type == 'start':
             try:
-                side = SLUR_SIDES_FOR_IMPORT[slur_el.attrib.get('placement', '')]
+                side = SLUR_SIDES_FOR_IMPORT[slur_el.get('placement', '')]
             except KeyError:
                 side = None
-            self.open_slurs[slur_number] = [Slur(side=side), dict(slur_el.attrib), None, note, None]
+            # The "default-x" attribute is the only one we need later.
+            self.open_slurs[slur_number] = [Slur(side=side), slur_el.get('default-x', ''), note, None]
         elif slur_type == 'stop':
-            open_slurs = self.open_slurs
             try:
-                open_slurs[slur_number][2] = dict(slur_el.attrib)
-                self.open_slurs[slur_number][4] = note
+                self.open_slurs[slur_number][3] = note
             except KeyError:
                 # Got <slur type="stop"> without matching <slur type="start">.
                 # TODO: Raise an error?
@@ -696,8 +818,8 @@ class MusicXMLReader:
         is now closed. Else returns None.
         """
         result = None
-        number = tuplet_el.attrib.get('number', '1')
-        tuplet_type = tuplet_el.attrib.get('type')
+        number = tuplet_el.get('number', '1')
+        tuplet_type = tuplet_el.get('type')
         if tuplet_type == 'start':
             self.open_tuplets[number] = []
         elif tuplet_type == 'stop':
@@ -711,15 +833,21 @@ class MusicXMLReader:
         for el in pitch_el:
             tag = el.tag
             if tag == 'alter':
-                try:
-                    alter = int(el.text)
-                except ValueError:
-                    raise NotationDataError(f'<pitch> on line {pitch_el.sourceline} has an invalid <alter>.')
+                text = el.text
+                alter = SMALL_INTEGERS.get(text)
+                if alter is None:
+                    try:
+                        alter = int(text)
+                    except (TypeError, ValueError):
+                        raise NotationDataError(f'<pitch> on line {pitch_el.sourceline} has an invalid <alter>.')
             elif tag == 'octave':
-                try:
-                    octave = int(el.text)
-                except ValueError:
-                    raise NotationDataError(f'<pitch> on line {pitch_el.sourceline} has an invalid <octave>.')
+                text = el.text
+                octave = SMALL_INTEGERS.get(text)
+                if octave is None:
+                    try:
+                        octave = int(text)
+                    except (TypeError, ValueError):
+                        raise NotationDataError(f'<pitch> on line {pitch_el.sourceline} has an invalid <octave>.')
             elif tag == 'step':
                 step = el.text
         if step is None:
@@ -761,19 +889,21 @@ class MusicXMLReader:
     def parse_type(self, type_el):
         text = type_el.text
         try:
-            return Fraction(*RHYTHM_TYPES[text])
+            return RHYTHM_TYPE_FRACTIONS[text]
         except KeyError:
             raise NotationDataError(f'<type> on line {type_el.sourceline} got unsupported value "{text}".')
 
     def get_open_tie_by_end_note(self, end_note):
-        for i, note in enumerate(self.open_ties):
-            if note != end_note and note.pitch == end_note.pitch:
-                del self.open_ties[i]
-                return note
+        pitch = end_note.pitch
+        notes = self.open_ties.get((pitch.step, pitch.octave, pitch.alter))
+        if notes:
+            for i, note in enumerate(notes):
+                if note != end_note:
+                    del notes[i]
+                    return note
         return None
 
-    def add_slur(self, slur, start_attrs, end_attrs, start_note, end_note):
-        other_slurs = self.complete_slurs
+    def add_slur(self, slur, start_default_x, start_note, end_note):
         start_event = self.score.get_event_containing_note(start_note)
         end_event = self.score.get_event_containing_note(end_note)
         if start_event == end_event:
@@ -783,7 +913,7 @@ class MusicXMLReader:
             # the <slur type="start"> element. If it's negative,
             # we interpret that as incoming.
             slur.is_incomplete = True
-            if re.match(r'-\d', start_attrs.get('default-x', '')):
+            if start_default_x[:1] == '-' and start_default_x[1:2].isdecimal():
                 incomplete_type = Slur.INCOMPLETE_TYPE_INCOMING
             else:
                 incomplete_type = Slur.INCOMPLETE_TYPE_OUTGOING
@@ -795,13 +925,16 @@ class MusicXMLReader:
 
             # Check for slurs that are attached to specific notes,
             # as opposed to slurs that are attached to events.
-            if self.heuristic_slur_targets_notes(slur, start_note, start_event, end_note, end_event, self.complete_slurs):
+            if self.heuristic_slur_targets_notes(start_event, end_event):
                 slur.start_note = start_note.note_id
                 slur.end_note = end_note.note_id
                 start_note.is_referenced = True
                 end_note.is_referenced = True
 
-        start_event.slurs.append(slur)
+        if start_event.slurs:
+            start_event.slurs.append(slur)
+        else:
+            start_event.slurs = [slur]
 
     def process_beams(self, part_id):
         if part_id not in self.open_beams:
@@ -856,7 +989,7 @@ class MusicXMLReader:
                 for beam_number in pending_ends:
                     part_open_beams.pop(beam_number)
                 pending_ends = []
-        self.current_beams = []
+        self.current_beams.clear()
 
     def add_octave_shift(self, shift_type, note_list):
         # note_list is assumed to be in order.
@@ -868,11 +1001,7 @@ class MusicXMLReader:
             end_pos=self.score.get_event_measure_location(end_event),
         ))
 
-    def heuristic_slur_targets_notes(self, slur, start_note, start_event, end_note, end_event, active_slurs):
-        for slur_data in active_slurs:
-            if slur_data[0] != slur:
-                other_start_event = self.score.get_event_containing_note(slur_data[3])
-                other_end_event = self.score.get_event_containing_note(slur_data[4])
-                if other_start_event == start_event and other_end_event == end_event:
-                    return True
-        return False
+    def heuristic_slur_targets_notes(self, start_event, end_event):
+        # More than one slur between the same two events means
+        # the slurs must be attached to specific notes.
+        return self.slur_event_pairs[(start_event, end_event)] > 1
@@ -27,31 +27,23 @@ class Score:
     def __init__(self):
         self.parts = []
         self.bars = []
+        self.note_events = {} # Maps each EventItem (Note or Rest) to the Event that contains it.
+        self.event_locations = {} # Maps each Event to (bar number, durations of its sequence's Events, index in durations).
 
     def get_event_measure_location(self, event):
         """
         Returns the given Event's measure location, as defined here:
         https://w3c.github.io/mnx/specification/common/#measure-location
         """
-        for bar_idx, bar in enumerate(self.bars):
-            for bar_part in bar.bar_parts.values():
-                for sequence in bar_part.sequences:
-                    metrical_pos = Fraction(0, 1)
-                    for seq_event in sequence.iter_events():
-                        if seq_event == event:
-                            return f'{bar_idx+1}:{metrical_pos.numerator}/{metrical_pos.denominator}'
-                        metrical_pos += seq_event.duration.frac
-        return ''
+        try:
+            bar_number, durations, idx = self.event_locations[event]
+        except KeyError:
+            return ''
+        metrical_pos = sum(durations[:idx], Fraction(0, 1))
+        return f'{bar_number}:{metrical_pos.numerator}/{metrical_pos.denominator}'
 
     def get_event_containing_note(self, note):
-        for bar in self.bars:
-            for bar_part in bar.bar_parts.values():
-                for sequence in bar_part.sequences:
-                    for event in sequence.iter_events():
-                        for event_item in event.event_items:
-                            if event_item == note:
-                                return event
-        return None
+        return self.note_events.get(note)
 
 class Part:
     def __init__(self, part_id=None, name=None, transpose=0):
@@ -60,6 +52,8 @@ class Part:
         self.transpose = transpose
 
 class Bar:
+    __slots__ = ('score', 'idx', 'timesig', 'keysig', 'start_repeat', 'end_repeat', 'start_ending', 'stop_ending', 'bar_parts')
+
     def __init__(self, score, idx: int, timesig=None, keysig=None):
         self.score = score
         self.idx = idx # Zero-based index of this bar in the score.
@@ -95,26 +89,30 @@ class Bar:
 
     def keysig_changed(self):
         "Returns True if this Bar's active keysig has changed since the last bar."
-        return (self.idx == 0 and self.keysig and self.keysig.fifths != 0) or \
-            (self.idx != 0 and self.previous().active_keysig() != self.active_keysig())
+        if self.idx == 0:
+            return self.keysig and self.keysig.fifths != 0
+        # Without its own keysig, a bar keeps the previous bar's keysig,
+        # so there's no need to walk back through the score.
+        return self.keysig is not None and self.previous().active_keysig() != self.keysig
 
 class BarPart:
+    __slots__ = ('sequences', 'sequences_by_id', 'clefs')
+
     def __init__(self):
         self.sequences = []
+        self.sequences_by_id = {} # Maps sequence_id to the Sequence in self.sequences.
         self.clefs = []
 
     def get_sequence(self, sequence_id):
-        for sequence in self.sequences:
-            if sequence.sequence_id == sequence_id:
-                return sequence
-        return None
+        return self.sequences_by_id.get(sequence_id)
 
     def get_or_create_sequence(self, sequence_id):
-        sequence = self.get_sequence(sequence_id)
-        if sequence is None:
-            sequence = Sequence([], sequence_id)
+        try:
+            return self.sequences_by_id[sequence_id]
+        except KeyError:
+            sequence = self.sequences_by_id[sequence_id] = Sequence([], sequence_id)
             self.sequences.append(sequence)
-        return sequence
+            return sequence
 
 class SequenceItem:
     """
@@ -124,6 +122,8 @@ class SequenceItem:
         * Event
         * GraceNoteGroup
     """
+    __slots__ = ('parent',)
+
     def __init__(self, parent):
         self.parent = parent # SequenceContent.
 
@@ -145,38 +145,52 @@ class SequenceContent:
         self.items = items # SequenceItem objects.
 
     def iter_events(self):
-        for item in self.items:
-            if isinstance(item, Event):
-                yield item
+        """
+        Yields every Event in this SequenceContent, in order, including
+        Events within (possibly nested) Tuplets and GraceNoteGroups.
+        """
+        # This uses an explicit stack of iterators rather than
+        # recursive generators, which would add a generator frame
+        # per level of nesting for every Event.
+        stack = [iter(self.items)]
+        while stack:
+            for item in stack[-1]:
+                if item.__class__ is Event:
+                    yield item
+                elif isinstance(item, SequenceContent):
+                    stack.append(iter(item.items))
+                    break
+                elif item.__class__ is GraceNoteGroup:
+                    yield from item.events
             else:
-                for event in item.iter_events():
-                    yield event
+                stack.pop()
 
     def find_item_idx_by_event(self, target):
         for i, item in enumerate(self.items):
-            if isinstance(item, Event):
-                if item == target:
-                    return i
+            if item is target:
+                return i
+            if isinstance(item, SequenceContent):
+                events = item.iter_events()
+            elif item.__class__ is GraceNoteGroup:
+                events = item.events
             else:
-                for event in item.iter_events():
-                    if event == target:
-                        return i
+                continue # E.g., an Ottava.
+            for event in events:
+                if event is target:
+                    return i
         return None
 
     def fold_items(self, item_list, klass, **kwargs):
         start_idx = self.find_item_idx_by_event(item_list[0])
         end_idx = self.find_item_idx_by_event(item_list[-1])
-        if start_idx is not None and end_idx is not None:
-            folded_items = self.items[start_idx:end_idx+1]
-            del self.items[start_idx:end_idx+1]
-            new_parent = klass(self, folded_items, **kwargs)
-            for item in folded_items:
-                item.parent = new_parent
-            self.items.insert(start_idx, new_parent)
-            return True
-        else:
+        if start_idx is None or end_idx is None:
             raise NotImplementedError("Could not fold items.")
-        return False
+        folded_items = self.items[start_idx:end_idx+1]
+        new_parent = klass(self, folded_items, **kwargs)
+        for item in folded_items:
+            item.parent = new_parent
+        self.items[start_idx:end_idx+1] = [new_parent]
+        return True
 
     def set_tuplet(self, ratio, item_list):
         """
@@ -194,7 +208,7 @@ class Sequence(SequenceContent):
 
     def get_last_event(self):
         for obj in reversed(self.items):
-            if isinstance(obj, Event):
+            if obj.__class__ is Event:
                 return obj
         return None
 
@@ -217,24 +231,35 @@ class GraceNoteGroup(SequenceItem):
         self.events = []
 
 class Event(SequenceItem):
-    def __init__(self, parent, event_id, duration):
+    # There's an Event for every note and rest, so we avoid a __dict__ per instance.
+    __slots__ = ('event_number', 'duration', 'event_items', 'slurs', 'markings', 'is_referenced')
+
+    def __init__(self, parent, event_number:int, duration):
         SequenceItem.__init__(self, parent)
-        self.event_id = event_id
+        self.event_number = event_number # Unique within the Score. Used to generate event_id.
         self.duration = duration # RhythmicDuration
         self.event_items = [] # EventItem objects.
-        self.slurs = [] # Slur objects.
+
+        # Most events have no slurs or markings, so these start out as
+        # a shared empty tuple and get replaced by a list when needed.
+        self.slurs = () # Slur objects.
 
         # List of Marking objects. MNX uses a dictionary for this, hence enforcing
         # uniqueness for markings (e.g., only a single staccato for an event), but
         # we use a list here, so that we can catch duplicates and have the option
         # to raise an error or warning during conversion.
-        self.markings = []
+        self.markings = ()
 
         self.is_referenced = False # True if this Event's event_id is referenced by another object in the Score.
 
+    @property
+    def event_id(self):
+        # This is generated on demand, because most events aren't referenced.
+        return f'ev{self.event_number}'
+
     def is_rest(self):
         for event_item in self.event_items:
-            if isinstance(event_item, Note):
+            if event_item.__class__ is Note:
                 return False
         return True
 
@@ -313,7 +338,7 @@ class Ending:
         self.numbers = numbers
 
 class EventItem:
-    pass
+    __slots__ = ()
 
 class Note(EventItem):
     # These are arbitrary codes, used only internally.
@@ -321,21 +346,27 @@ class Note(EventItem):
     ACCIDENTAL_NATURAL = 2
     ACCIDENTAL_FLAT = 3
     ACCIDENTAL_DOUBLE_SHARP = 4
-    ACCIDENTAL_DOUBLE_SHARP = 5
     ACCIDENTAL_DOUBLE_FLAT = 6
     ACCIDENTAL_NATURAL_SHARP = 7
     ACCIDENTAL_NATURAL_FLAT = 8
 
-    def __init__(self, score, note_id):
+    __slots__ = ('score', 'note_number', 'pitch', 'rendered_acc', 'tie_end_note', 'is_referenced')
+
+    def __init__(self, score, note_number:int):
         self.score = score
-        self.note_id = note_id
+        self.note_number = note_number # Unique within the Score. Used to generate note_id.
         self.pitch = None
         self.rendered_acc = None # None, or one of Note.ACCIDENTAL_*.
         self.tie_end_note = None # ID of Note that ends a tie that starts on this Note.
         self.is_referenced = False # True if this Note's note_id is referenced by another object in the Score.
 
+    @property
+    def note_id(self):
+        # This is generated on demand, because most notes aren't referenced.
+        return f'note{self.note_number}'
+
 class Rest(EventItem):
-    pass
+    __slots__ = ()
 
 class Slur:
     # These are arbitrary codes, used only internally.
@@ -343,6 +374,8 @@ class Slur:
     SIDE_DOWN = 2
     INCOMPLETE_TYPE_INCOMING = 1
     INCOMPLETE_TYPE_OUTGOING = 2
+    __slots__ = ('end_event_id', 'side', 'is_incomplete', 'incomplete_type', 'start_note', 'end_note')
+
     def __init__(self, end_event_id=None, side=None, is_incomplete=None, incomplete_type=None, start_note=None, end_note=None):
         self.end_event_id = end_event_id
         self.side = side
@@ -352,13 +385,27 @@ class Slur:
         self.end_note = end_note
 
 class RhythmicDuration:
+    __slots__ = ('frac', 'dots')
+
     def __init__(self, frac, dots=0):
         self.frac = frac # fractions.Fraction object.
         self.dots = dots
 
     def __eq__(self, other):
-        return self.frac == other.frac and self.dots == other.dots
-
+        # Note types usually share a Fraction, so try identity first.
+        return (self.frac is other.frac or self.frac == other.frac) and self.dots == other.dots
+
+    def __hash__(self):
+        return hash((self.frac, self.dots))
+
+ALTER_STRINGS = {
+    # Maps Pitch.alter values to accidental strings.
+    0: '',
+    1: '#',
+    2: '##',
+    -1: 'b',
+    -2: 'bb',
+}
 STEP_INTEGER_WHITE_KEYS = {
     0: 'C',
     2: 'D',
@@ -368,11 +415,16 @@ STEP_INTEGER_WHITE_KEYS = {
     9: 'A',
     11: 'B',
 }
+STEP_INTEGERS = {step: step_integer for step_integer, step in STEP_INTEGER_WHITE_KEYS.items()}
+# Indexed by step integer. Black keys map to the empty string.
+STEP_INTEGER_STEPS = tuple(STEP_INTEGER_WHITE_KEYS.get(i, '') for i in range(NUM_PITCHES_IN_OCTAVE))
 
 class Pitch:
     # Pitch objects don't know whether they're in concert or transposed.
     # They're agnostic. It's the responsibility of calling code to interpret
     # them correctly.
+    __slots__ = ('step', 'octave', 'alter')
+
     def __init__(self, step: str, octave: int, alter: int=0):
         self.step = step # One of {'A', 'B', 'C', 'D', 'E', 'F', 'G'}.
         self.octave = octave
@@ -384,30 +436,33 @@ class Pitch:
     def __eq__(self, other):
         return self.step == other.step and self.octave == other.octave and self.alter == other.alter
 
+    def __hash__(self):
+        return hash((self.step, self.octave, self.alter))
+
     @classmethod
     def from_midi_number(cls, midi_number, prefer_flat=True):
         octave = (midi_number // NUM_PITCHES_IN_OCTAVE) - 1
         step_integer = midi_number % NUM_PITCHES_IN_OCTAVE
-        if step_integer in STEP_INTEGER_WHITE_KEYS:
-            alter = 0
+        step = STEP_INTEGER_STEPS[step_integer]
+        if step:
+            return cls(step, octave, 0)
+        if prefer_flat:
+            step_integer = (step_integer + 1) % NUM_PITCHES_IN_OCTAVE
+            alter = -1
         else:
-            if prefer_flat:
-                step_integer = (step_integer + 1) % NUM_PITCHES_IN_OCTAVE
-                alter = -1
-            else:
-                step_integer = (step_integer - 1 + NUM_PITCHES_IN_OCTAVE) % NUM_PITCHES_IN_OCTAVE
-                alter = 1
-        return cls(STEP_INTEGER_WHITE_KEYS[step_integer], octave, alter)
+            step_integer = (step_integer - 1 + NUM_PITCHES_IN_OCTAVE) % NUM_PITCHES_IN_OCTAVE
+            alter = 1
+        return cls(STEP_INTEGER_STEPS[step_integer], octave, alter)
 
     def midi_number(self):
         # C4 = 60
         return (NUM_PITCHES_IN_OCTAVE * (self.octave + 1)) + self.step_integer() + self.alter
 
     def step_integer(self):
-        return {'C': 0, 'D': 2, 'E': 4, 'F': 5, 'G': 7, 'A': 9, 'B': 11}[self.step]
+        return STEP_INTEGERS[self.step]
 
     def accidental_string(self):
-        return {0: '', 1: '#', 2: '##', -1: 'b', -2: 'bb'}[self.alter]
+        return ALTER_STRINGS[self.alter]
 
     def scientific_pitch_string(self):
         return f'{self.step}{self.accidental_string()}{self.octave}'
@@ -430,6 +485,8 @@ class Pitch:
         return self.transpose_chromatic(part.transpose)
 
 class KeySignature:
+    __slots__ = ('fifths',)
+
     def __init__(self, fifths):
         self.fifths = fifths
 
@@ -466,11 +523,15 @@ class KeySignature:
         return self.transpose_chromatic(part.transpose)
 
 class Clef:
+    __slots__ = ('sign', 'staff_position')
+
     def __init__(self, sign, staff_position:int):
         self.sign = sign
         self.staff_position = staff_position # 0 means "middle of staff"
 
 class PositionedClef:
+    __slots__ = ('clef', 'position')
+
     def __init__(self, clef, position:Fraction):
         self.clef = clef
         self.position = position # Rhythmic position within the bar.
@@ -1,5 +1,6 @@
 from mnxconverter.musicxml import get_score as get_score_from_musicxml
 from mnxconverter.mnx import put_score as put_mnx_score
+import json
 import os
 import unittest
 
@@ -10,8 +11,16 @@ class TestMetaclass(type):
     Metaclass that adds a test method for every file in the 'tests' directory.
     """
     def __new__(cls, name, bases, attrs):
-        def make_test_func(input_markup: bytes, expected_output: bytes):
-            return lambda self: self.autotest(input_markup, expected_output)
+        def make_test_func(input_filename: str, output_filename: str):
+            # The files are read when the test runs, not when the
+            # class is created, so running one test only reads its files.
+            def test_func(self):
+                with open(input_filename, 'rb') as fp:
+                    input_markup = fp.read()
+                with open(output_filename, 'rb') as fp:
+                    expected_output = fp.read()
+                self.autotest(input_markup, expected_output)
+            return test_func
         i = 0
         for root, dirs, files in os.walk(DATA_DIR):
             for f in files:
@@ -19,10 +28,7 @@ class TestMetaclass(type):
                     filename = f.split('.')[0] # Trim extension.
                     input_filename = os.path.join(root, filename + '.musicxml')
                     output_filename = os.path.join(root, filename + '.mnx')
-                    func = make_test_func(
-                        open(input_filename, 'rb').read(),
-                        open(output_filename, 'rb').read()
-                    )
+                    func = make_test_func(input_filename, output_filename)
                     func.__doc__ = filename
                     attrs['test_{0:03}'.format(i)] = func # Use '0:03' to make tests run in alphabetical order.
                     i += 1
@@ -31,7 +37,16 @@ class TestMetaclass(type):
 class FileformatTests(unittest.TestCase, metaclass=TestMetaclass):
     def autotest(self, input_markup: bytes, expected_output: bytes):
         score = get_score_from_musicxml(input_markup)
-        self.assertEqual(put_mnx_score(score).strip(), expected_output.strip())
+        output = put_mnx_score(score)
+        self.assertEqual(output.strip(), expected_output.strip())
+        json.loads(output, object_pairs_hook=self.assert_keys_sorted)
+        compact_output = put_mnx_score(score, pretty=False)
+        self.assertEqual(json.loads(compact_output), json.loads(output))
+
+    def assert_keys_sorted(self, pairs):
+        keys = [key for key, value in pairs]
+        self.assertEqual(keys, sorted(keys))
+        return dict(pairs)
 
 if __name__ == "__main__":
     unittest.main()